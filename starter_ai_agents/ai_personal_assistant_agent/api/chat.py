@@ -1,10 +1,13 @@
-"""Vercel serverless API for the AI Personal Assistant. POST /api/chat with JSON body."""
+"""Vercel serverless API for the AI Personal Assistant. POST /api/chat with JSON body.
+
+GET /api/chat returns request counters (admitted, coalesced, rejected, timed out, in-flight)."""
 
 from __future__ import annotations
 
 import json
 import os
 import sys
+import threading
 from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 
@@ -14,41 +17,94 @@ if str(_AGENT_ROOT) not in sys.path:
     sys.path.insert(0, str(_AGENT_ROOT))
 os.chdir(_AGENT_ROOT)
 
-# Lazy-initialized agent (reused across warm invocations)
-_agent = None
+# Lazy-initialized (agent, store) pair (reused across warm invocations); the store is the
+# one the agent's tools were built with, so shard routing always targets the right instance
+_runtime = None
+_runtime_lock = threading.Lock()
+_gate = None
+_gate_lock = threading.Lock()
 
 
-def _get_agent():
-    global _agent
-    if _agent is None:
+# Sharded mode routes on an opaque, client-generated session id; short ids are guessable
+_MIN_SESSION_ID_LENGTH = 16
+
+
+def _get_runtime():
+    global _runtime
+    if _runtime is not None:
+        return _runtime
+    # Concurrent first requests must share one agent/store: separate ShardedStateStores would
+    # each cache the same shard files and silently lose writes
+    with _runtime_lock:
+        if _runtime is not None:
+            return _runtime
         from app.agent import build_agent_executor
         from app.config import get_settings
         from app.model_factory import build_chat_model
-        from app.storage import StateStore
+        from app.snapshot import load_snapshot, snapshot_path
+        from app.storage import ShardedStateStore, StateStore
         from app.tools import build_tools
 
         settings = get_settings()
-        # Use /tmp on Vercel for ephemeral state (or ASSISTANT_DATA_FILE env)
-        data_file = os.getenv("ASSISTANT_DATA_FILE", "/tmp/assistant_state.json")
-        store = StateStore(data_file)
+        # Warm start: model resolved at deploy time (if the snapshot is current)
+        snapshot = load_snapshot(snapshot_path(), settings.llm_provider)
+        if settings.shard_dir:
+            # Multi-tenant: one state file per session
+            store = ShardedStateStore(
+                settings.shard_dir,
+                max_open=settings.shard_cache_size,
+                compact=settings.compact_state,
+            )
+        else:
+            # Use /tmp on Vercel for ephemeral state (or ASSISTANT_DATA_FILE env)
+            data_file = os.getenv("ASSISTANT_DATA_FILE", "/tmp/assistant_state.json")
+            store = StateStore(data_file, compact=settings.compact_state)
         tools = build_tools(store)
         llm, _, _ = build_chat_model(
             provider=settings.llm_provider,
-            explicit_model_name=settings.model_name,
-            enable_web_refresh=False,  # Skip web refresh on serverless
+            explicit_model_name=settings.model_name or (snapshot or {}).get("model_name"),
+            enable_web_refresh=False,  # Skip web refresh on serverless (snapshot carries its result)
             nvidia_base_url=settings.nvidia_base_url if settings.llm_provider == "nvidia" else None,
             nvidia_api_key=settings.nvidia_api_key if settings.llm_provider == "nvidia" else None,
         )
         # Code evolution disabled on Vercel (read-only filesystem)
-        _agent = build_agent_executor(llm=llm, tools=tools, controller_mode=False)
-    return _agent
+        agent = build_agent_executor(llm=llm, tools=tools, controller_mode=False)
+        _runtime = (agent, store)
+    return _runtime
+
+
+def _get_agent():
+    return _get_runtime()[0]
+
+
+def _is_sharded() -> bool:
+    from app.storage import ShardedStateStore
+
+    return isinstance(_get_runtime()[1], ShardedStateStore)
 
 
-def _invoke_agent(message: str, chat_history: list) -> str:
+def _get_gate():
+    global _gate
+    with _gate_lock:
+        if _gate is None:
+            from app.config import get_settings
+            from app.request_control import RequestGate
+
+            settings = get_settings()
+            _gate = RequestGate(
+                max_concurrent=settings.max_concurrent_runs,
+                retry_after=settings.retry_after_seconds,
+                wait_timeout=settings.coalesce_timeout_seconds,
+                max_waiters=settings.max_coalesced_waiters,
+            )
+    return _gate
+
+
+def _invoke_agent(message: str, chat_history: list, shard_key: str | None = None) -> str:
     from langchain_core.messages import AIMessage, HumanMessage
     from langchain_core.messages.base import BaseMessage
 
-    agent = _get_agent()
+    agent, store = _get_runtime()
     messages: list[BaseMessage] = []
     for h in chat_history:
         if h.get("role") == "user":
@@ -57,7 +113,11 @@ def _invoke_agent(message: str, chat_history: list) -> str:
             messages.append(AIMessage(content=h.get("content", "")))
     messages.append(HumanMessage(content=message))
 
-    result = agent.invoke({"messages": messages})
+    if shard_key is not None:
+        with store.use(shard_key):
+            result = agent.invoke({"messages": messages})
+    else:
+        result = agent.invoke({"messages": messages})
     out_messages = result["messages"]
     output = ""
     for m in reversed(out_messages):
@@ -73,6 +133,9 @@ class handler(BaseHTTPRequestHandler):
         self._cors_headers()
         self.end_headers()
 
+    def do_GET(self):
+        self._send_json(200, {"stats": _get_gate().stats()})
+
     def do_POST(self):
         try:
             content_length = int(self.headers.get("Content-Length", 0))
@@ -87,22 +150,55 @@ class handler(BaseHTTPRequestHandler):
             self._send_json(400, {"error": "message is required"})
             return
 
-        chat_history = data.get("chat_history", [])
+        from app.request_control import CoalesceTimeout, Overloaded, coalesce_key
 
+        chat_history = data.get("chat_history", [])
+        # The session id is a random per-browser value, not a verified identity: anyone who
+        # learns it can read that shard. Put real auth in front of the API for production.
+        session = str(data.get("session_id") or self.headers.get("X-Session-Id") or "").strip()
+        try:
+            # Builds the agent on first use; a failed build must still answer with JSON
+            sharded = _is_sharded()
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        shard_key = None
+        if sharded:
+            if len(session) < _MIN_SESSION_ID_LENGTH:
+                self._send_json(
+                    400,
+                    {"error": f"session_id (random, at least {_MIN_SESSION_ID_LENGTH} chars) is required"},
+                )
+                return
+            shard_key = session
+
+        # Retries/double-submits from the same session share one agent run; without a
+        # session id requests from different users could collide, so they are not coalesced.
+        key = coalesce_key(session, message, chat_history) if session else None
         try:
-            response = _invoke_agent(message, chat_history)
+            response = _get_gate().run(
+                key, lambda: _invoke_agent(message, chat_history, shard_key=shard_key)
+            )
             self._send_json(200, {"response": response})
+        except Overloaded as e:
+            self._send_json(
+                429, {"error": str(e)}, headers={"Retry-After": str(e.retry_after)}
+            )
+        except CoalesceTimeout as e:
+            self._send_json(504, {"error": str(e)})
         except Exception as e:
             self._send_json(500, {"error": str(e)})
 
     def _cors_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, X-Session-Id")
 
-    def _send_json(self, status: int, data: dict):
+    def _send_json(self, status: int, data: dict, headers: dict | None = None):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self._cors_headers()
         self.end_headers()
         self.wfile.write(json.dumps(data).encode("utf-8"))
@@ -15,8 +15,15 @@ class Settings:
     model_name: str | None
     enable_model_web_refresh: bool
     data_file: str
+    compact_state: bool
     nvidia_base_url: str
     nvidia_api_key: str | None
+    shard_dir: str | None
+    shard_cache_size: int
+    max_concurrent_runs: int
+    retry_after_seconds: int
+    coalesce_timeout_seconds: float
+    max_coalesced_waiters: int
 
 
 def get_settings() -> Settings:
@@ -24,15 +31,29 @@ def get_settings() -> Settings:
     model_name = os.getenv("MODEL_NAME") or None
     refresh = os.getenv("ENABLE_MODEL_WEB_REFRESH", "true").strip().lower() == "true"
     data_file = os.getenv("ASSISTANT_DATA_FILE", "assistant_state.json").strip()
+    compact_state = os.getenv("ASSISTANT_COMPACT_STATE", "").strip().lower() in ("1", "true", "yes")
     nvidia_base_url = (
         os.getenv("NIM_BASE_URL", "https://integrate.api.nvidia.com/v1").strip().rstrip("/")
     )
     nvidia_api_key = os.getenv("NIM_API_KEY") or os.getenv("NVIDIA_API_KEY") or None
+    shard_dir = os.getenv("ASSISTANT_SHARD_DIR", "").strip() or None
+    shard_cache_size = int(os.getenv("ASSISTANT_SHARD_CACHE_SIZE", "256"))
+    max_concurrent_runs = int(os.getenv("ASSISTANT_MAX_CONCURRENT_RUNS", "8"))
+    retry_after_seconds = int(os.getenv("ASSISTANT_RETRY_AFTER_SECONDS", "2"))
+    coalesce_timeout_seconds = float(os.getenv("ASSISTANT_COALESCE_TIMEOUT_SECONDS", "55"))
+    max_coalesced_waiters = int(os.getenv("ASSISTANT_MAX_COALESCED_WAITERS", "16"))
     return Settings(
         llm_provider=provider,
         model_name=model_name,
         enable_model_web_refresh=refresh,
         data_file=data_file,
+        compact_state=compact_state,
         nvidia_base_url=nvidia_base_url,
         nvidia_api_key=nvidia_api_key,
+        shard_dir=shard_dir,
+        shard_cache_size=shard_cache_size,
+        max_concurrent_runs=max_concurrent_runs,
+        retry_after_seconds=retry_after_seconds,
+        coalesce_timeout_seconds=coalesce_timeout_seconds,
+        max_coalesced_waiters=max_coalesced_waiters,
     )
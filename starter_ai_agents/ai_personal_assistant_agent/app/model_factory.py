@@ -1,19 +1,17 @@
 from __future__ import annotations
 
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-
 from app.model_recommender import FALLBACK_MODELS, get_latest_model_recommendation
 
+# Provider SDKs are imported only for the selected provider: importing all of them
+# (anthropic alone is ~1s) dominated serverless cold start.
 
-def build_chat_model(
+
+def resolve_model_name(
     provider: str,
     explicit_model_name: str | None = None,
     enable_web_refresh: bool = True,
-    nvidia_base_url: str | None = None,
-    nvidia_api_key: str | None = None,
-):
+) -> tuple[str, bool]:
+    """Return (model_name, used_fallback) without constructing a client."""
     normalized_provider = provider.lower().strip()
     if normalized_provider not in FALLBACK_MODELS:
         raise ValueError(
@@ -21,25 +19,41 @@ def build_chat_model(
             f"{', '.join(sorted(FALLBACK_MODELS.keys()))}"
         )
 
-    model_name = explicit_model_name
-    used_fallback = False
+    if explicit_model_name:
+        return explicit_model_name, False
+    if enable_web_refresh:
+        recommendation = get_latest_model_recommendation(normalized_provider)
+        return recommendation.model, recommendation.used_fallback
+    return FALLBACK_MODELS[normalized_provider], True
+
 
-    if not model_name:
-        if enable_web_refresh:
-            recommendation = get_latest_model_recommendation(normalized_provider)
-            model_name = recommendation.model
-            used_fallback = recommendation.used_fallback
-        else:
-            model_name = FALLBACK_MODELS[normalized_provider]
-            used_fallback = True
+def build_chat_model(
+    provider: str,
+    explicit_model_name: str | None = None,
+    enable_web_refresh: bool = True,
+    nvidia_base_url: str | None = None,
+    nvidia_api_key: str | None = None,
+):
+    normalized_provider = provider.lower().strip()
+    model_name, used_fallback = resolve_model_name(
+        normalized_provider, explicit_model_name, enable_web_refresh
+    )
 
     if normalized_provider == "openai":
+        from langchain_openai import ChatOpenAI
+
         llm = ChatOpenAI(model=model_name, temperature=0.2)
     elif normalized_provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+
         llm = ChatAnthropic(model=model_name, temperature=0.2)
     elif normalized_provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         llm = ChatGoogleGenerativeAI(model=model_name, temperature=0.2)
     elif normalized_provider == "nvidia":
+        from langchain_openai import ChatOpenAI
+
         base_url = nvidia_base_url or "https://integrate.api.nvidia.com/v1"
         api_key = nvidia_api_key or ""
         llm = ChatOpenAI(
@@ -49,6 +63,8 @@ def build_chat_model(
             api_key=api_key,
         )
     else:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         llm = ChatGoogleGenerativeAI(model=model_name, temperature=0.2)
 
     return llm, model_name, used_fallback
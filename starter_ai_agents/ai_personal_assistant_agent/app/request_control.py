@@ -0,0 +1,111 @@
+"""In-flight request coalescing and admission control for the chat API."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable
+
+
+class Overloaded(Exception):
+    """Raised when the concurrent-run cap is reached; the caller should answer 429."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many concurrent requests, retry later.")
+        self.retry_after = retry_after
+
+
+class CoalesceTimeout(Exception):
+    """Raised when a coalesced request gives up waiting on the in-flight run; answer 504."""
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+def coalesce_key(session: str, message: str, chat_history: list) -> str:
+    payload = json.dumps([message, chat_history], sort_keys=True, separators=(",", ":"))
+    return f"{session}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class RequestGate:
+    """Runs agent calls with duplicate suppression and a cap on concurrent runs.
+
+    Calls sharing a key while one is in flight wait for that run's result instead of starting
+    their own. New runs beyond max_concurrent are rejected immediately with Overloaded
+    (max_concurrent <= 0 disables the cap). Waiters are bounded too, since they hold a server
+    thread each: at most max_waiters per flight (extra duplicates get Overloaded), and each
+    gives up with CoalesceTimeout after wait_timeout seconds."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        retry_after: int = 2,
+        wait_timeout: float = 55.0,
+        max_waiters: int = 16,
+    ):
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.wait_timeout = wait_timeout
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._running = 0
+        self._counters = {"admitted": 0, "coalesced": 0, "rejected": 0, "timed_out": 0}
+
+    def run(self, key: str | None, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key) if key is not None else None
+            if flight is not None:
+                if flight.waiters >= self.max_waiters:
+                    self._counters["rejected"] += 1
+                    raise Overloaded(self.retry_after)
+                flight.waiters += 1
+                self._counters["coalesced"] += 1
+            else:
+                if 0 < self.max_concurrent <= self._running:
+                    self._counters["rejected"] += 1
+                    raise Overloaded(self.retry_after)
+                self._running += 1
+                self._counters["admitted"] += 1
+                if key is not None:
+                    self._flights[key] = _Flight()
+                leader = self._flights.get(key) if key is not None else None
+
+        if flight is not None:
+            finished = flight.done.wait(self.wait_timeout)
+            with self._lock:
+                flight.waiters -= 1
+                if not finished:
+                    self._counters["timed_out"] += 1
+            if not finished:
+                raise CoalesceTimeout("Timed out waiting for an identical in-flight request.")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            result = fn()
+            if leader is not None:
+                leader.result = result
+            return result
+        except BaseException as e:
+            if leader is not None:
+                leader.error = e
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                if key is not None:
+                    self._flights.pop(key, None)
+            if leader is not None:
+                leader.done.set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters, in_flight=self._running, max_concurrent=self.max_concurrent)
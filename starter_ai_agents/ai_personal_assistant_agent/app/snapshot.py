@@ -0,0 +1,129 @@
+"""Deploy-time snapshot of the resolved model, reused on cold start.
+
+The model name is resolved once at deploy time (including the optional docs-page refresh), so
+serverless boot never makes that network call and still gets the refreshed recommendation.
+
+    python -m app.snapshot              # write agent_snapshot.json (run before deploying)
+    python -m app.snapshot --measure    # compare api/chat.py cold start with and without it
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+SNAPSHOT_VERSION = 3
+DEFAULT_SNAPSHOT_FILE = "agent_snapshot.json"
+
+_APP_DIR = Path(__file__).resolve().parent
+_AGENT_ROOT = _APP_DIR.parent
+
+def snapshot_path() -> Path | None:
+    """Snapshot location; ASSISTANT_AGENT_SNAPSHOT= (empty) disables the warm-start path."""
+    value = os.getenv("ASSISTANT_AGENT_SNAPSHOT", str(_AGENT_ROOT / DEFAULT_SNAPSHOT_FILE)).strip()
+    return Path(value) if value else None
+
+
+def source_hash() -> str:
+    """Hash of the sources model resolution depends on (two small files; well under 1ms)."""
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode("utf-8"))
+    for path in (_APP_DIR / "model_factory.py", _APP_DIR / "model_recommender.py"):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_snapshot(settings) -> dict[str, Any]:
+    from app.model_factory import resolve_model_name
+
+    model_name, used_fallback = resolve_model_name(
+        settings.llm_provider, settings.model_name, settings.enable_model_web_refresh
+    )
+    return {
+        "version": SNAPSHOT_VERSION,
+        "source_hash": source_hash(),
+        "provider": settings.llm_provider,
+        "model_name": model_name,
+        "used_fallback": used_fallback,
+    }
+
+
+def write_snapshot(path: Path, settings) -> dict[str, Any]:
+    snapshot = build_snapshot(settings)
+    path.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+    return snapshot
+
+
+def load_snapshot(path: Path | None, provider: str) -> dict[str, Any] | None:
+    """Return the snapshot if it was built for this provider from the current sources, else None."""
+    if path is None or not path.is_file():
+        return None
+    try:
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("provider") != provider:
+        return None
+    if snapshot.get("source_hash") != source_hash():
+        return None
+    return snapshot
+
+
+_COLD_START_PROBE = (
+    "import time; t = time.perf_counter(); import api.chat as c; c._get_agent(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _measure_cold_start(snapshot_file: str, runs: int) -> list[float]:
+    env = dict(os.environ, ASSISTANT_AGENT_SNAPSHOT=snapshot_file)
+    # Model clients validate that a key is set at construction; no request is made
+    for key in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY"):
+        env.setdefault(key, "snapshot-measure")
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _COLD_START_PROBE],
+            cwd=_AGENT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the deploy-time model snapshot.")
+    parser.add_argument("--out", default=None, help="Snapshot path (default: ASSISTANT_AGENT_SNAPSHOT or agent root)")
+    parser.add_argument("--measure", action="store_true", help="Time api/chat.py cold start with and without it")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.config import get_settings
+
+    settings = get_settings()
+    out = Path(args.out) if args.out else snapshot_path() or _AGENT_ROOT / DEFAULT_SNAPSHOT_FILE
+    snapshot = write_snapshot(out, settings)
+    print(
+        f"Wrote {out} (provider={settings.llm_provider} model={snapshot['model_name']} "
+        f"fallback={snapshot['used_fallback']})"
+    )
+
+    if args.measure:
+        without = _measure_cold_start("", args.runs)
+        with_snapshot = _measure_cold_start(str(out), args.runs)
+        for label, timings in (("without snapshot", without), ("with snapshot", with_snapshot)):
+            timings.sort()
+            print(f"{label}: median={timings[len(timings) // 2] * 1000:.1f}ms min={timings[0] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Streaming NDJSON export/import and bulk loading for the JSON state file (constant memory).
+
+    python -m app.state_io export backup.ndjson
+    python -m app.state_io import backup.ndjson --compact       # replaces the state file
+    python -m app.state_io bulk-load records.ndjson --batch-size 100000
+
+NDJSON lines look like {"type": "task", "data": {...}} or {"type": "note", "data": {...}}.
+
+bulk-load validates and stages the input in a sidecar journal (<state file>.journal.ndjson),
+then folds it into the state file in one streaming rewrite at the end, so total work is linear
+in existing + new records. It is all-or-nothing: a failed or interrupted load applies nothing
+and can simply be rerun.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+# NDJSON record type -> state file section
+SECTIONS = {"task": "tasks", "note": "notes"}
+_KINDS = {section: kind for kind, section in SECTIONS.items()}
+
+_CHUNK_SIZE = 1 << 16
+
+
+class _StreamReader:
+    """Incrementally decodes the {"tasks": [...], "notes": [...]} state file one record at a time."""
+
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.fp.read(_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of state file")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} in state file")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A scalar ending exactly at the buffer edge may be truncated
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def records(self) -> Iterator[tuple[str, dict]]:
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key in _KINDS and self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield _KINDS[key], self._value()
+                        if self._peek() == ",":
+                            self.pos += 1
+                            continue
+                        self._expect("]")
+                        break
+            else:
+                self._value()
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+
+def iter_state_records(state_path: str | Path) -> Iterator[tuple[str, dict]]:
+    """Yield (type, record) for every task and note in the state file without loading it whole."""
+    with open(state_path, encoding="utf-8") as fp:
+        yield from _StreamReader(fp).records()
+
+
+def iter_ndjson(fp: IO[str]) -> Iterator[tuple[str, dict]]:
+    for line_no, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_no}: invalid JSON ({e})") from None
+        kind = item.get("type")
+        if kind not in SECTIONS or not isinstance(item.get("data"), dict):
+            raise ValueError(f"Line {line_no}: expected {{\"type\": \"task\"|\"note\", \"data\": {{...}}}}")
+        yield kind, item["data"]
+
+
+def export_ndjson(state_path: str | Path, out: IO[str]) -> int:
+    count = 0
+    for kind, record in iter_state_records(state_path):
+        out.write(json.dumps({"type": kind, "data": record}, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def _normalize(kind: str, record: dict, task_count: int, renumber: bool) -> dict:
+    # Match the shape StateStore.add_task / add_note produce so list/complete keep working
+    if kind == "task":
+        if renumber:
+            # Appended tasks continue the store's numbering (as add_task does); keeping
+            # incoming ids would duplicate ids already in the file
+            record["id"] = str(task_count + 1)
+        else:
+            record.setdefault("id", str(task_count + 1))
+        record.setdefault("title", "")
+        record.setdefault("due_date", "")
+        record.setdefault("completed", False)
+    else:
+        record.setdefault("title", "")
+        record.setdefault("content", "")
+    return record
+
+
+class _ArrayWriter:
+    def __init__(self, out: IO[str], compact: bool):
+        self.out = out
+        self.compact = compact
+        self.count = 0
+
+    def write(self, record: dict) -> None:
+        if self.compact:
+            text = json.dumps(record, separators=(",", ":"))
+            self.out.write(("," if self.count else "") + text)
+        else:
+            # Same layout as json.dumps(payload, indent=2) in StateStore.save
+            text = "\n".join("    " + line for line in json.dumps(record, indent=2).splitlines())
+            self.out.write(("," if self.count else "") + "\n" + text)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self.compact and self.count:
+            self.out.write("\n  ")
+
+
+def _rewrite_state(
+    state_path: Path,
+    existing: Iterable[tuple[str, dict]],
+    new_records: Iterable[tuple[str, dict]],
+    compact: bool,
+    renumber_tasks: bool = False,
+) -> tuple[int, int]:
+    """Stream existing + new records into a temp file and atomically replace state_path.
+
+    Tasks are written straight to the output; notes are spooled to a temp file and appended
+    after, so memory use does not depend on the number of records."""
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=state_path.parent, prefix=state_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out, tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+            out.write('{"tasks":[' if compact else '{\n  "tasks": [')
+            tasks = _ArrayWriter(out, compact)
+            notes = _ArrayWriter(spool, compact)
+            added = 0
+            for is_new, records in ((False, existing), (True, new_records)):
+                for kind, record in records:
+                    if is_new:
+                        record = _normalize(kind, record, tasks.count, renumber_tasks)
+                        added += 1
+                    (tasks if kind == "task" else notes).write(record)
+            tasks.close()
+            notes.close()
+            out.write('],"notes":[' if compact else '],\n  "notes": [')
+            spool.seek(0)
+            while True:
+                chunk = spool.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+            out.write("]}" if compact else "]\n}")
+        os.replace(tmp_name, state_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return tasks.count + notes.count, added
+
+
+def import_ndjson(ndjson: IO[str], state_path: str | Path, compact: bool = False) -> int:
+    """Replace the state file with the records in ndjson. Returns the number imported."""
+    _, added = _rewrite_state(Path(state_path), (), iter_ndjson(ndjson), compact)
+    return added
+
+
+def journal_path(state_path: str | Path) -> Path:
+    path = Path(state_path)
+    return path.with_name(path.name + ".journal.ndjson")
+
+
+def bulk_load(
+    ndjson: IO[str],
+    state_path: str | Path,
+    batch_size: int = 100_000,
+    compact: bool = False,
+) -> int:
+    """Append records from ndjson to the state file. Returns the number of records added.
+
+    Appended tasks get new ids following the existing tasks; incoming ids are ignored.
+
+    All-or-nothing: the whole input is validated while it is staged to a journal (flushed every
+    batch_size records), and only then is the state file rewritten, once, atomically. A malformed
+    line or an interrupted process leaves the state file untouched, so the load can be rerun."""
+    path = Path(state_path)
+    journal = journal_path(path)
+    # A journal left by an interrupted load was never applied; discard it and start over
+    journal.unlink(missing_ok=True)
+    try:
+        with open(journal, "w", encoding="utf-8") as jf:
+            pending = 0
+            for kind, record in iter_ndjson(ndjson):
+                jf.write(json.dumps({"type": kind, "data": record}, separators=(",", ":")) + "\n")
+                pending += 1
+                if pending >= batch_size:
+                    jf.flush()
+                    pending = 0
+        with open(journal, encoding="utf-8") as fp:
+            existing = iter_state_records(path) if path.exists() else ()
+            _, added = _rewrite_state(path, existing, iter_ndjson(fp), compact, renumber_tasks=True)
+    finally:
+        journal.unlink(missing_ok=True)
+    return added
+
+
+def main() -> None:
+    from app.config import get_settings
+
+    parser = argparse.ArgumentParser(description="Stream assistant state to/from NDJSON.")
+    parser.add_argument("--data-file", default=None, help="State file (default: ASSISTANT_DATA_FILE)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Write tasks and notes as NDJSON")
+    exp.add_argument("output", nargs="?", default="-", help="Output path or - for stdout")
+    for name, help_text in (
+        ("import", "Replace state with NDJSON records (task ids are kept)"),
+        ("bulk-load", "Append NDJSON records (appended tasks are renumbered after existing ones)"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("input", help="Input path or - for stdin")
+        cmd.add_argument("--compact", action="store_true", help="Write compact JSON (default: ASSISTANT_COMPACT_STATE)")
+        if name == "bulk-load":
+            cmd.add_argument(
+                "--batch-size",
+                type=int,
+                default=100_000,
+                help="Records staged per journal flush. Total cost is one journal append per record "
+                "plus a single streaming rewrite of the state file at the end; memory use is "
+                "constant regardless of batch size. The load is all-or-nothing.",
+            )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    data_file = args.data_file or settings.data_file
+
+    if args.command == "export":
+        if args.output == "-":
+            count = export_ndjson(data_file, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8") as out:
+                count = export_ndjson(data_file, out)
+        print(f"Exported {count} records.", file=sys.stderr)
+        return
+
+    compact = args.compact or settings.compact_state
+    fp = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        if args.command == "import":
+            count = import_ndjson(fp, data_file, compact=compact)
+        else:
+            count = bulk_load(fp, data_file, batch_size=args.batch_size, compact=compact)
+    except ValueError as e:
+        sys.exit(f"{args.command} aborted: {e}. Nothing was applied to {data_file}; fix the input and rerun.")
+    finally:
+        if fp is not sys.stdin:
+            fp.close()
+    print(f"Loaded {count} records into {data_file}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 
 @dataclass
@@ -14,32 +21,65 @@ class AssistantState:
 
 
 class StateStore:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, cache_state: bool = False, compact: bool = False):
+        """cache_state: keep the last loaded/saved state in memory instead of re-reading the file.
+        Only safe when this instance is the sole writer of file_path.
+        compact: write minified JSON instead of indented (smaller file, faster save)."""
         self.path = Path(file_path)
+        self._cache_state = cache_state
+        self._compact = compact
+        self._cached: AssistantState | None = None
+        # Serializes load-modify-save within the process (the API runs agents concurrently);
+        # readers need no lock because save() replaces the file atomically
+        self._lock = threading.Lock()
         if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
             self.save(AssistantState())
 
     def load(self) -> AssistantState:
+        if self._cached is not None:
+            return self._cached
         raw = json.loads(self.path.read_text(encoding="utf-8"))
-        return AssistantState(tasks=raw.get("tasks", []), notes=raw.get("notes", []))
+        state = AssistantState(tasks=raw.get("tasks", []), notes=raw.get("notes", []))
+        if self._cache_state:
+            self._cached = state
+        return state
 
     def save(self, state: AssistantState) -> None:
         payload = {"tasks": state.tasks, "notes": state.notes}
-        self.path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        if self._compact:
+            text = json.dumps(payload, separators=(",", ":"))
+        else:
+            text = json.dumps(payload, indent=2)
+        # Write-then-rename so concurrent readers never see a truncated file
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(text)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            # Callers mutate the cached state before saving; drop it so the next load
+            # re-reads what actually reached disk instead of a change that never did
+            self._cached = None
+            raise
+        if self._cache_state:
+            self._cached = state
 
     def add_task(self, title: str, due_date: str = "") -> str:
-        state = self.load()
-        task_id = str(len(state.tasks) + 1)
-        state.tasks.append(
-            {
-                "id": task_id,
-                "title": title.strip(),
-                "due_date": due_date.strip(),
-                "completed": False,
-            }
-        )
-        self.save(state)
-        return f"Task created with id={task_id}."
+        with self._lock:
+            state = self.load()
+            task_id = str(len(state.tasks) + 1)
+            state.tasks.append(
+                {
+                    "id": task_id,
+                    "title": title.strip(),
+                    "due_date": due_date.strip(),
+                    "completed": False,
+                }
+            )
+            self.save(state)
+            return f"Task created with id={task_id}."
 
     def list_tasks(self, include_completed: bool = False) -> str:
         state = self.load()
@@ -56,19 +96,21 @@ class StateStore:
         return "\n".join(rows)
 
     def complete_task(self, task_id: str) -> str:
-        state = self.load()
-        for task in state.tasks:
-            if task["id"] == task_id:
-                task["completed"] = True
-                self.save(state)
-                return f"Task {task_id} marked complete."
-        return f"Task {task_id} not found."
+        with self._lock:
+            state = self.load()
+            for task in state.tasks:
+                if task["id"] == task_id:
+                    task["completed"] = True
+                    self.save(state)
+                    return f"Task {task_id} marked complete."
+            return f"Task {task_id} not found."
 
     def add_note(self, title: str, content: str) -> str:
-        state = self.load()
-        state.notes.append({"title": title.strip(), "content": content.strip()})
-        self.save(state)
-        return "Note saved."
+        with self._lock:
+            state = self.load()
+            state.notes.append({"title": title.strip(), "content": content.strip()})
+            self.save(state)
+            return "Note saved."
 
     def list_notes(self) -> str:
         state = self.load()
@@ -93,3 +135,111 @@ class StateStore:
         for task in todays_tasks:
             lines.append(f"- [{task['id']}] {task['title']}")
         return "\n".join(lines)
+
+
+@dataclass
+class _Shard:
+    # Opened lazily under lock, so file I/O never happens while holding the LRU lock
+    store: StateStore | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    pins: int = 0
+
+
+class ShardedStateStore:
+    """Multi-tenant store: one StateStore file per user/session key under base_dir.
+
+    Exposes the same task/note methods as StateStore, routed to the shard selected with
+    use(key). Keeps at most max_open shards (and their cached state) in an LRU; shards are
+    opened lazily and evicted least-recently-used first. Each shard has its own lock, so
+    different users never contend on the same file or lock."""
+
+    def __init__(self, base_dir: str, max_open: int = 256, compact: bool = False):
+        self.base_dir = Path(base_dir)
+        self.max_open = max(1, max_open)
+        self.compact = compact
+        self._shards: OrderedDict[str, _Shard] = OrderedDict()
+        self._lru_lock = threading.Lock()
+        self._current: ContextVar[str | None] = ContextVar("assistant_shard_key", default=None)
+
+    def shard_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        # Two-level fan-out keeps directories small with many users
+        return self.base_dir / digest[:2] / f"{digest}.json"
+
+    @contextmanager
+    def use(self, key: str) -> Iterator[None]:
+        """Route store calls made in this context (including agent tool calls) to key's shard."""
+        token = self._current.set(key)
+        try:
+            yield
+        finally:
+            self._current.reset(token)
+
+    def _checkout(self, key: str) -> _Shard:
+        with self._lru_lock:
+            shard = self._shards.get(key)
+            if shard is None:
+                shard = _Shard()
+                self._shards[key] = shard
+            else:
+                self._shards.move_to_end(key)
+            shard.pins += 1
+            self._evict_locked()
+            return shard
+
+    def _release(self, shard: _Shard) -> None:
+        with self._lru_lock:
+            shard.pins -= 1
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        # Pinned shards are in use; evicting them could leave two live handles for one file
+        excess = len(self._shards) - self.max_open
+        if excess <= 0:
+            return
+        for key in [k for k, s in self._shards.items() if s.pins == 0][:excess]:
+            del self._shards[key]
+
+    @contextmanager
+    def _locked_store(self) -> Iterator[StateStore]:
+        key = self._current.get()
+        if key is None:
+            raise RuntimeError("No shard selected; wrap calls in ShardedStateStore.use(key).")
+        shard = self._checkout(key)
+        try:
+            with shard.lock:
+                if shard.store is None:
+                    shard.store = StateStore(
+                        str(self.shard_path(key)), cache_state=True, compact=self.compact
+                    )
+                yield shard.store
+        finally:
+            self._release(shard)
+
+    def open_count(self) -> int:
+        with self._lru_lock:
+            return len(self._shards)
+
+    def add_task(self, title: str, due_date: str = "") -> str:
+        with self._locked_store() as store:
+            return store.add_task(title=title, due_date=due_date)
+
+    def list_tasks(self, include_completed: bool = False) -> str:
+        with self._locked_store() as store:
+            return store.list_tasks(include_completed=include_completed)
+
+    def complete_task(self, task_id: str) -> str:
+        with self._locked_store() as store:
+            return store.complete_task(task_id=task_id)
+
+    def add_note(self, title: str, content: str) -> str:
+        with self._locked_store() as store:
+            return store.add_note(title=title, content=content)
+
+    def list_notes(self) -> str:
+        with self._locked_store() as store:
+            return store.list_notes()
+
+    def today_plan(self) -> str:
+        with self._locked_store() as store:
+            return store.today_plan()
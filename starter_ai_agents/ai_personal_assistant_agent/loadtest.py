@@ -0,0 +1,310 @@
+"""Load test for api/chat.py against a local OpenAI-compatible stub LLM.
+
+Starts a stub /v1/chat/completions server (configurable latency and token rate), points the
+app at it through the nvidia provider (NIM_BASE_URL), serves the Vercel chat handler locally
+and drives it with N concurrent users running multi-turn scripts.
+
+    python loadtest.py --users 20 --turns 4 --latency-ms 200 --tokens-per-sec 80
+    python loadtest.py --max-concurrent-runs 8 --max-p95-ms 3000 --max-error-rate 0.01 --min-rps 5
+
+Simulated users honor 429 Retry-After and retry (up to --max-retries); latency is measured
+end to end, including those waits. 429s are reported separately from errors (rejected = 429
+responses seen, shed = requests still 429 after all retries). Exits 1 when a gate threshold
+is violated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+DEFAULT_SCRIPT = [
+    "Hi, what can you do?",
+    "Add a task: buy milk",
+    "List my tasks",
+    "Thanks!",
+]
+
+
+def _make_stub_handler(latency_s: float, tokens_per_sec: float, completion_tokens: int):
+    class StubLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            messages = body.get("messages", [])
+            last = messages[-1] if messages else {}
+
+            message: dict = {"role": "assistant", "content": ""}
+            finish_reason = "stop"
+            content = str(last.get("content") or "")
+            tools = {t.get("function", {}).get("name") for t in body.get("tools", [])}
+            if last.get("role") == "user" and "task:" in content.lower() and "add_task" in tools:
+                # Exercise the tool path (and the state store) like a real model would
+                title = content.split(":", 1)[1].strip() or "task"
+                message["tool_calls"] = [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {"name": "add_task", "arguments": json.dumps({"title": title})},
+                    }
+                ]
+                finish_reason = "tool_calls"
+                tokens = 16
+            else:
+                message["content"] = " ".join(["ok"] * completion_tokens)
+                tokens = completion_tokens
+
+            delay = latency_s + (tokens / tokens_per_sec if tokens_per_sec > 0 else 0.0)
+            time.sleep(delay)
+
+            payload = json.dumps(
+                {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return StubLLMHandler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog (5) resets connections once a few dozen users connect at once
+    request_queue_size = 1024
+
+
+def _serve(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def _run_user(
+    url: str,
+    session_id: str,
+    script: list[str],
+    turns: int,
+    max_retries: int,
+    results: list,
+    lock: threading.Lock,
+):
+    session = requests.Session()
+    history: list[dict] = []
+    for turn in range(turns):
+        msg = script[turn % len(script)]
+        started = time.perf_counter()
+        status = 0
+        rejected = 0
+        for attempt in range(max_retries + 1):
+            try:
+                resp = session.post(
+                    url,
+                    json={"message": msg, "chat_history": history, "session_id": session_id},
+                    timeout=120,
+                )
+            except requests.RequestException:
+                status = 0
+                break
+            status = resp.status_code
+            if status != 429:
+                break
+            rejected += 1
+            if attempt < max_retries:
+                time.sleep(float(resp.headers.get("Retry-After", "1")))
+        if status == 200:
+            outcome = "ok"
+            history += [
+                {"role": "user", "content": msg},
+                {"role": "assistant", "content": resp.json().get("response", "")},
+            ]
+        else:
+            outcome = "shed" if status == 429 else "error"
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append((elapsed, outcome, status, rejected))
+
+
+def run_load_test(args) -> dict:
+    stub = _Server(
+        ("127.0.0.1", 0),
+        _make_stub_handler(args.latency_ms / 1000, args.tokens_per_sec, args.completion_tokens),
+    )
+    _serve(stub)
+
+    os.environ.update(
+        {
+            "LLM_PROVIDER": "nvidia",
+            "NIM_BASE_URL": f"http://127.0.0.1:{stub.server_address[1]}/v1",
+            "NIM_API_KEY": "stub",
+            "MODEL_NAME": "stub-model",
+            "ENABLE_WEB_SEARCH": "",
+            "ENABLE_CODE_EVOLUTION": "",
+        }
+    )
+    if args.max_concurrent_runs is not None:
+        os.environ["ASSISTANT_MAX_CONCURRENT_RUNS"] = str(args.max_concurrent_runs)
+    data_dir = tempfile.mkdtemp(prefix="assistant_loadtest_")
+    if args.sharded:
+        os.environ["ASSISTANT_SHARD_DIR"] = data_dir
+    else:
+        os.environ.pop("ASSISTANT_SHARD_DIR", None)
+        os.environ["ASSISTANT_DATA_FILE"] = os.path.join(data_dir, "assistant_state.json")
+
+    from api.chat import handler
+
+    class QuietChatHandler(handler):
+        # Per-request access logs to stderr would flood output and skew the measurement
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+    api = _Server(("127.0.0.1", 0), QuietChatHandler)
+    _serve(api)
+    url = f"http://127.0.0.1:{api.server_address[1]}/api/chat"
+
+    # Warm-up request so agent construction is not counted as latency
+    requests.post(url, json={"message": "warm up", "session_id": f"warmup-{uuid.uuid4().hex}"}, timeout=120)
+
+    results: list[tuple[float, str, int, int]] = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_run_user,
+            args=(
+                url,
+                f"loadtest-{uuid.uuid4().hex}",
+                DEFAULT_SCRIPT,
+                args.turns,
+                args.max_retries,
+                results,
+                lock,
+            ),
+        )
+        for i in range(args.users)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - started
+
+    server_stats = requests.get(url, timeout=10).json().get("stats", {})
+    api.shutdown()
+    stub.shutdown()
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if r[1] == "error")
+    shed = sum(1 for r in results if r[1] == "shed")
+    statuses: dict[str, int] = {}
+    for r in results:
+        statuses[str(r[2])] = statuses.get(str(r[2]), 0) + 1
+    total = len(results)
+    return {
+        "users": args.users,
+        "turns": args.turns,
+        "requests": total,
+        "duration_s": round(duration, 3),
+        "rps": round(total / duration, 2) if duration else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rejected_429": sum(r[3] for r in results),
+        "shed": shed,
+        "shed_rate": round(shed / total, 4) if total else 0.0,
+        "status_counts": statuses,
+        "server_stats": server_stats,
+    }
+
+
+def check_gates(report: dict, args) -> list[str]:
+    failures = []
+    if args.max_p95_ms is not None and report["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 {report['p95_ms']}ms > {args.max_p95_ms}ms")
+    if args.max_p99_ms is not None and report["p99_ms"] > args.max_p99_ms:
+        failures.append(f"p99 {report['p99_ms']}ms > {args.max_p99_ms}ms")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {report['error_rate']} > {args.max_error_rate}")
+    if args.max_shed_rate is not None and report["shed_rate"] > args.max_shed_rate:
+        failures.append(f"shed rate {report['shed_rate']} > {args.max_shed_rate}")
+    if args.min_rps is not None and report["rps"] < args.min_rps:
+        failures.append(f"rps {report['rps']} < {args.min_rps}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test api/chat.py against a stub LLM.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=len(DEFAULT_SCRIPT), help="Turns per user")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub LLM base latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0, help="Stub LLM token rate (0 = instant)")
+    parser.add_argument("--completion-tokens", type=int, default=20, help="Tokens per stub text reply")
+    parser.add_argument("--sharded", action="store_true", help="Use per-user shards (ASSISTANT_SHARD_DIR)")
+    parser.add_argument(
+        "--max-concurrent-runs",
+        type=int,
+        default=None,
+        help="Set ASSISTANT_MAX_CONCURRENT_RUNS for the run (default: env or app default)",
+    )
+    parser.add_argument("--max-retries", type=int, default=3, help="Retries per request after a 429")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Non-200, non-429 outcomes")
+    parser.add_argument("--max-shed-rate", type=float, default=None, help="Requests still 429 after retries")
+    parser.add_argument("--min-rps", type=float, default=None)
+    args = parser.parse_args()
+
+    report = run_load_test(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{report['requests']} requests from {report['users']} users in {report['duration_s']}s: "
+            f"{report['rps']} req/s | p50={report['p50_ms']}ms p95={report['p95_ms']}ms "
+            f"p99={report['p99_ms']}ms | errors={report['errors']} ({report['error_rate']:.2%}) "
+            f"| 429s={report['rejected_429']} shed={report['shed']} ({report['shed_rate']:.2%}) "
+            f"| status={report['status_counts']} | server={report['server_stats']}"
+        )
+
+    failures = check_gates(report, args)
+    if failures:
+        print("Load test gate FAILED: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from app.tools import build_tools
 
 def main() -> None:
     settings = get_settings()
-    store = StateStore(settings.data_file)
+    store = StateStore(settings.data_file, compact=settings.compact_state)
     controller_mode = os.getenv("ENABLE_CODE_EVOLUTION", "").strip().lower() in ("1", "true", "yes")
 
     def make_agent():